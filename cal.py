@@ -1,7 +1,8 @@
 import ast
+import functools
 import operator
 import math
-import sys
+import re
 from decimal import Decimal, getcontext, Context, DivisionByZero
 from fractions import Fraction
 
@@ -45,145 +46,138 @@ _CONSTS = {
 class EvalError(ValueError):
     pass
 
+def _decimal_to_fraction(value):
+    # exakt und in C (_decimal); auch _pydecimal kennt as_integer_ratio
+    return Fraction(*value.as_integer_ratio())
+
+# exakte Typen -> Umwandlung; eine Dict-Abfrage statt isinstance-Kette
+_DEC_CAST = {
+    Decimal: lambda v: v,
+    int: Decimal,
+    float: lambda v: Decimal(repr(v)),
+    Fraction: lambda v: Decimal(v.numerator) / Decimal(v.denominator),
+}
+
+_FRAC_CAST = {
+    Fraction: lambda v: v,
+    Decimal: _decimal_to_fraction,
+    int: Fraction,
+    float: Fraction,
+}
+
 def _to_decimal(value, ctx: Context = None):
+    cast = _DEC_CAST.get(type(value))
+    if cast is not None:
+        return cast(value)
+    # Unterklassen (z.B. bool) und sonstige Typen
     if isinstance(value, Decimal):
         return value
+    if isinstance(value, int):
+        return Decimal(value)
     if isinstance(value, Fraction):
         return Decimal(value.numerator) / Decimal(value.denominator)
     return Decimal(str(value)) if not isinstance(value, float) else Decimal(repr(value))
 
 def _to_fraction(value):
+    cast = _FRAC_CAST.get(type(value))
+    if cast is not None:
+        return cast(value)
     if isinstance(value, Fraction):
         return value
     if isinstance(value, Decimal):
-        tup = value.as_tuple()
-        digits = 0
-        for d in tup.digits:
-            digits = digits * 10 + d
-        exp = tup.exponent
-        if exp >= 0:
-            return Fraction(digits * (10 ** exp))
-        else:
-            return Fraction(digits, 10 ** (-exp))
+        return _decimal_to_fraction(value)
     return Fraction(value)
 
-def eval_expr(expr: str, mode: str = "float", precision: int | None = None):
-    if mode not in ("float", "decimal", "fraction"):
-        raise EvalError("Unbekannter Modus")
+# Funktionstabellen je Modus; alle Einträge haben die Signatur (ctx, *args)
 
-    ctx = None
-    if mode == "decimal":
-        if precision is None:
-            precision = 28
-        ctx = getcontext().copy()
-        ctx.prec = int(precision)
-
-    def convert_number(n):
-        if mode == "float":
-            return float(n)
-        if mode == "fraction":
-            return Fraction(n)
-        return _to_decimal(n, ctx)
-
-    def convert_const(name):
-        if name not in _CONSTS:
-            raise EvalError(f"Unbekannter Name: {name}")
-        val = _CONSTS[name]
-        if mode == "float":
-            return float(val)
-        if mode == "fraction":
-            return Fraction(val)
-        return _to_decimal(val, ctx)
-
-    def make_function(name):
-        if name not in _MATH_FUNCS:
-            raise EvalError(f"Unbekannte Funktion: {name}")
-        func = _MATH_FUNCS[name]
-
-        def wrapper(*args):
-            if mode == "fraction":
-                if name == "abs":
-                    return abs(_to_fraction(args[0]))
-                if name == "max":
-                    return max(_to_fraction(a) for a in args)
-                if name == "min":
-                    return min(_to_fraction(a) for a in args)
-                if name == "pow":
-                    base, exp = (_to_fraction(a) for a in args)
-                    if exp.denominator != 1:
-                        raise EvalError("pow mit nicht-ganzzahligem Exponenten im Fraction-Modus nicht erlaubt")
-                    return base ** int(exp)
-                raise EvalError(f"Funktion {name} nicht im Fraction-Modus unterstützt")
-
-            if mode == "decimal":
-                if name == "sqrt":
-                    try:
-                        return ctx.sqrt(args[0])
-                    except Exception:
-                        return _to_decimal(math.sqrt(float(args[0])), ctx)
-                if name in ("log", "ln"):
-                    return _to_decimal(math.log(float(args[0])), ctx)
-                if name in ("sin", "cos", "tan"):
-                    return _to_decimal(func(float(args[0])), ctx)
-                if name == "pow":
-                    a, b = args
-                    if isinstance(b, Decimal) and b == b.to_integral_value():
-                        return a ** int(b)
-                    return _to_decimal(math.pow(float(a), float(b)), ctx)
-                if name in ("max", "min"):
-                    return max(args)
-                return _to_decimal(func(float(args[0])), ctx)
-
-            return func(*[float(a) for a in args])
-
-        return wrapper
-
-    def _eval(node):
-        if isinstance(node, ast.Constant):
-            if isinstance(node.value, (int, float)):
-                return convert_number(node.value)
-            raise EvalError("Nur Zahlen als Konstanten erlaubt")
-
-        if sys.version_info < (3, 8) and isinstance(node, ast.Num):
-            return convert_number(node.n)
-
-        if isinstance(node, ast.BinOp):
-            op_type = type(node.op)
-            if op_type not in OPS:
-                raise EvalError("Nicht unterstützter Operator")
-            left = _eval(node.left)
-            right = _eval(node.right)
-            func = OPS[op_type]
-            try:
-                return func(left, right)
-            except ZeroDivisionError:
-                raise
-            except Exception as e:
-                if mode == "decimal":
-                    return func(_to_decimal(left, ctx), _to_decimal(right, ctx))
-                if mode == "fraction":
-                    return func(_to_fraction(left), _to_fraction(right))
-                raise EvalError(str(e))
+def _float_func(func):
+    def wrapper(ctx, *args):
+        return func(*[float(a) for a in args])
+    return wrapper
 
-        if isinstance(node, ast.UnaryOp):
-            op_type = type(node.op)
-            if op_type not in OPS:
-                raise EvalError("Nicht unterstützter Unary-Operator")
-            return OPS[op_type](_eval(node.operand))
+def _dec_float_func(func):
+    def wrapper(ctx, *args):
+        return _to_decimal(func(float(args[0])), ctx)
+    return wrapper
 
-        if isinstance(node, ast.Call):
-            if not isinstance(node.func, ast.Name):
-                raise EvalError("Nur einfache Funktionsaufrufe erlaubt")
-            fname = node.func.id
-            func = make_function(fname)
-            args = tuple(_eval(a) for a in node.args)
-            return func(*args)
+def _dec_sqrt(ctx, *args):
+    try:
+        return ctx.sqrt(args[0])
+    except Exception:
+        return _to_decimal(math.sqrt(float(args[0])), ctx)
+
+def _dec_pow(ctx, *args):
+    a, b = args
+    if isinstance(b, Decimal) and b == b.to_integral_value():
+        return a ** int(b)
+    return _to_decimal(math.pow(float(a), float(b)), ctx)
+
+def _dec_max(ctx, *args):
+    return max(args)
+
+def _dec_min(ctx, *args):
+    return min(args)
+
+def _frac_unsupported(name):
+    def wrapper(ctx, *args):
+        raise EvalError(f"Funktion {name} nicht im Fraction-Modus unterstützt")
+    return wrapper
+
+def _frac_abs(ctx, *args):
+    return abs(_to_fraction(args[0]))
+
+def _frac_max(ctx, *args):
+    return max(_to_fraction(a) for a in args)
+
+def _frac_min(ctx, *args):
+    return min(_to_fraction(a) for a in args)
+
+def _frac_pow(ctx, *args):
+    base, exp = (_to_fraction(a) for a in args)
+    if exp.denominator != 1:
+        raise EvalError("pow mit nicht-ganzzahligem Exponenten im Fraction-Modus nicht erlaubt")
+    return base ** int(exp)
+
+_FN_FLOAT = {name: _float_func(func) for name, func in _MATH_FUNCS.items()}
+
+_FN_DECIMAL = {name: _dec_float_func(func) for name, func in _MATH_FUNCS.items()}
+_FN_DECIMAL.update({
+    "sqrt": _dec_sqrt,
+    "pow": _dec_pow,
+    "max": _dec_max,
+    "min": _dec_min,
+})
+
+_FN_FRACTION = {name: _frac_unsupported(name) for name in _MATH_FUNCS}
+_FN_FRACTION.update({
+    "abs": _frac_abs,
+    "max": _frac_max,
+    "min": _frac_min,
+    "pow": _frac_pow,
+})
+
+_FN_BY_MODE = {
+    "float": _FN_FLOAT,
+    "decimal": _FN_DECIMAL,
+    "fraction": _FN_FRACTION,
+}
 
-        if isinstance(node, ast.Name):
-            return convert_const(node.id)
+# Modusabhängiges wird einmal pro Auswertung gewählt, nicht pro Knoten
+_CONVERT = {
+    "float": float,
+    "decimal": _to_decimal,
+    "fraction": Fraction,
+}
 
-        raise EvalError("Ungültiger Ausdruck")
+# Decimal-Kontext je Präzision; hängt nur von prec ab (nicht vom globalen
+# Kontext), wird nur gelesen (ctx.sqrt) und daher geteilt
+@functools.lru_cache(maxsize=16)
+def _decimal_ctx(prec: int) -> Context:
+    return Context(prec=prec)
 
+# Der Baum wird nie verändert und kann daher zwischen Modi geteilt werden
+@functools.lru_cache(maxsize=512)
+def _parse(expr: str) -> ast.Expression:
     try:
         tree = ast.parse(expr, mode="eval")
     except SyntaxError:
@@ -191,29 +185,169 @@ def eval_expr(expr: str, mode: str = "float", precision: int | None = None):
 
     if not isinstance(tree, ast.Expression):
         raise EvalError("Nur Ausdrücke erlaubt")
+    return tree
 
-    return _eval(tree.body)
+# pi/e je Modus einmal umgewandelt; Decimal(repr(x)) hängt nicht von prec ab
+_CONSTS_BY_MODE = {
+    mode: {name: convert(val) for name, val in _CONSTS.items()}
+    for mode, convert in _CONVERT.items()
+}
 
+def _convert_const(name, mode):
+    consts = _CONSTS_BY_MODE[mode]
+    if name not in consts:
+        raise EvalError(f"Unbekannter Name: {name}")
+    return consts[name]
+
+def _make_function(name, mode):
+    func = _FN_BY_MODE[mode].get(name)
+    if func is None:
+        raise EvalError(f"Unbekannte Funktion: {name}")
+    return func
+
+# Zustand einer Auswertung; Knoten-Handler siehe _HANDLERS
+class _Evaluator:
+    __slots__ = ("mode", "ctx", "convert")
+
+    def __init__(self, mode, ctx):
+        self.mode = mode
+        self.ctx = ctx
+        self.convert = _CONVERT[mode]
+
+    def eval(self, node):
+        handler = _HANDLERS.get(type(node))
+        if handler is None:
+            raise EvalError("Ungültiger Ausdruck")
+        return handler(self, node)
+
+    def eval_constant(self, node):
+        if isinstance(node.value, (int, float)):
+            return self.convert(node.value)
+        raise EvalError("Nur Zahlen als Konstanten erlaubt")
+
+    def eval_binop(self, node):
+        # linke Kette iterativ abarbeiten: kein Python-Aufruf pro Kettenglied
+        # und keine Rekursionstiefe bei langen Ketten wie 1+2+...+n
+        chain = []
+        while True:
+            func = OPS.get(type(node.op))
+            if func is None:
+                raise EvalError("Nicht unterstützter Operator")
+            chain.append((func, node.right))
+            node = node.left
+            if type(node) is not ast.BinOp:
+                break
+        value = self.eval(node)
+        for func, right in reversed(chain):
+            right = self.eval(right)
+            try:
+                value = func(value, right)
+            except ZeroDivisionError:
+                raise
+            except Exception as e:
+                # nur float meldet Operatorfehler als EvalError; Decimal und
+                # Fraction rechnen ohne Angleichen, Python fördert Typen selbst
+                if self.mode != "float":
+                    raise
+                raise EvalError(str(e))
+        return value
+
+    def eval_unaryop(self, node):
+        op_type = type(node.op)
+        if op_type is ast.USub:
+            return -self.eval(node.operand)
+        if op_type is ast.UAdd:
+            return self.eval(node.operand)
+        raise EvalError("Nicht unterstützter Unary-Operator")
+
+    def eval_call(self, node):
+        if type(node.func) is not ast.Name:
+            raise EvalError("Nur einfache Funktionsaufrufe erlaubt")
+        func = _make_function(node.func.id, self.mode)
+        return func(self.ctx, *[self.eval(a) for a in node.args])
+
+    def eval_name(self, node):
+        return _convert_const(node.id, self.mode)
+
+_HANDLERS = {
+    ast.Constant: _Evaluator.eval_constant,
+    ast.BinOp: _Evaluator.eval_binop,
+    ast.UnaryOp: _Evaluator.eval_unaryop,
+    ast.Call: _Evaluator.eval_call,
+    ast.Name: _Evaluator.eval_name,
+}
+
+# ohne führende Nullen: "007" ist für ast.parse ein Syntaxfehler
+_SIMPLE_NUM_RE = re.compile(r"(-?)((?:0|[1-9][0-9]*)(?:\.[0-9]+)?)")
+
+# Decimal-Operatoren rechnen im globalen Kontext: alles daran, was ihre
+# Ergebnisse ändert (Flags nicht); traps.copy() ist deutlich schneller als
+# über das SignalDict selbst zu iterieren
+def _decimal_state() -> tuple:
+    c = getcontext()
+    return (c.prec, c.rounding, c.Emin, c.Emax, c.clamp, tuple(c.traps.copy().values()))
+
+# Ergebnis-Cache; lru_cache ist begrenzt und auch bei parallelen Aufrufen
+# sicher. global_state ist nur Teil des Schlüssels (siehe _decimal_state).
+@functools.lru_cache(maxsize=512)
+def _evaluate(expr: str, mode: str, precision: int | None, global_state: tuple | None = None):
+    ctx = _decimal_ctx(precision) if mode == "decimal" else None
+    return _Evaluator(mode, ctx).eval(_parse(expr).body)
+
+# setzt alle Ausdrucks-Caches zurück (z.B. für Tests)
+def _clear_expr_cache():
+    _parse.cache_clear()
+    _evaluate.cache_clear()
+    _decimal_ctx.cache_clear()
+    auto_detect_mode.cache_clear()
+
+def eval_expr(expr: str, mode: str = "float", precision: int | None = None):
+    if mode not in ("float", "decimal", "fraction"):
+        raise EvalError("Unbekannter Modus")
+
+    expr = expr.strip()
+    if mode == "decimal":
+        if precision is None:
+            precision = 28
+        precision = int(precision)
+    else:
+        precision = None
+
+    # Schnellweg für reine Zahleneingaben wie "123" oder "-4.5"
+    m = _SIMPLE_NUM_RE.fullmatch(expr)
+    if m is not None:
+        digits = m.group(2)
+        try:
+            number = float(digits) if "." in digits else int(digits)
+        except ValueError:
+            # zu lange Ganzzahl; ast.parse meldet hier ebenfalls einen Syntaxfehler
+            raise EvalError("Syntaxfehler")
+        value = _CONVERT[mode](number)
+        return -value if m.group(1) else value
+
+    if mode == "decimal":
+        return _evaluate(expr, mode, precision, _decimal_state())
+    return _evaluate(expr, mode, precision)
+
+# Kommazahl oder Float-Funktion -> decimal
+_DECIMAL_HINT_RE = re.compile(r"\.|sin|cos|tan|log|ln|sqrt")
+# erster "/" steht zwischen zwei Ziffern -> fraction
+_FRACTION_DIV_RE = re.compile(r"[^/]*\d/\d")
+# nach Entfernen der Operatoren bleiben bei reinen Ganzzahl-Ausdrücken nur Ziffern
+_INT_OPS_DELETE = str.maketrans("", "", "+-*/()")
+
+@functools.lru_cache(maxsize=256)
 def auto_detect_mode(expr: str) -> str:
     expr = expr.replace(" ", "")
 
-    if "." in expr:
+    if _DECIMAL_HINT_RE.search(expr):
         return "decimal"
 
-    float_funcs = ("sin", "cos", "tan", "log", "ln", "sqrt")
-    if any(f in expr for f in float_funcs):
-        return "decimal"
-
-    if "/" in expr and "//" not in expr:
-        parts = expr.split("/")
-        try:
-            int(parts[0][-1])
-            int(parts[1][0])
-            return "fraction"
-        except Exception:
-            pass
+    if "//" not in expr and _FRACTION_DIV_RE.match(expr):
+        return "fraction"
 
-    if all(ch.isdigit() or ch in "+-*/() " for ch in expr):
+    rest = expr.translate(_INT_OPS_DELETE)
+    if not rest or rest.isdigit():
         return "fraction"
 
     return "float"
@@ -223,6 +357,9 @@ def auto_detect_mode(expr: str) -> str:
 #  MINI‑OS‑KOMPATIBLE VERSION DES TASCHENRECHNERS
 # ============================================================
 
+# Anzeige-Schreibweise -> Python-Syntax, einmal pro Berechnung angewendet
+_INSERT_MAP = str.maketrans({"^": "**"})
+
 class CalculatorApp:
     def __init__(self, parent):
         self.root = parent  # kein Tk(), sondern Frame im Mini‑OS
@@ -337,7 +474,7 @@ class CalculatorApp:
         elif text == "=":
             cmd = self.calculate
         else:
-            cmd = lambda t=text: self.insert_text(t)
+            cmd = functools.partial(self.insert_text, text)
 
         btn = tk.Button(self.root, text=text, command=cmd, **cfg)
         btn.grid(row=row, column=col, padx=6, pady=6, sticky="nsew")
@@ -407,10 +544,8 @@ class CalculatorApp:
         self.apply_theme()
 
     def insert_text(self, text):
-        if text == "^":
-            text = "**"
-        pos = self.display.index(tk.INSERT)
-        self.display.insert(pos, text)
+        # "^" wird erst beim Berechnen übersetzt (_INSERT_MAP)
+        self.display.insert(tk.INSERT, text)
 
     def clear(self):
         self.display.delete(0, tk.END)
@@ -422,7 +557,7 @@ class CalculatorApp:
             self.display.delete(pos - 1)
 
     def calculate(self):
-        expr = self.display.get().strip()
+        expr = self.display.get().strip().translate(_INSERT_MAP)
         if not expr:
             return
 
@@ -443,7 +578,7 @@ class CalculatorApp:
         else:
             result_str = str(res)
             self.history.append((expr, result_str, mode))
-            self.update_history_listbox()
+            self.append_history_listbox(expr, result_str, mode)
 
             self.display.delete(0, tk.END)
             self.display.insert(0, result_str)
@@ -490,15 +625,21 @@ class CalculatorApp:
         if self.history_window is None or not tk.Toplevel.winfo_exists(self.history_window):
             return
         self.history_listbox.delete(0, tk.END)
-        for expr, res, mode in self.history:
-            self.history_listbox.insert(tk.END, f"[{mode}] {expr} = {res}")
+        for expr, result_str, mode in self.history:
+            self.history_listbox.insert(tk.END, f"[{mode}] {expr} = {result_str}")
+
+    def append_history_listbox(self, expr, result_str, mode):
+        if self.history_window is None or not tk.Toplevel.winfo_exists(self.history_window):
+            return
+        self.history_listbox.insert(tk.END, f"[{mode}] {expr} = {result_str}")
 
     def on_history_double_click(self, event):
         selection = self.history_listbox.curselection()
         if not selection:
             return
-        index = len(self.history) - 1 - selection[0]
-        expr, res, mode = self.history[index]
+        # Listbox-Zeilen stehen in derselben Reihenfolge wie self.history
+        index = selection[0]
+        expr, result_str, mode = self.history[index]
         self.display.delete(0, tk.END)
         self.display.insert(0, expr)
         self.mode_label.config(text=f"Modus: {mode}")
@@ -1,6 +1,7 @@
 import tkinter as tk
 import json
 import os
+from functools import partial
 import requests
 
 # ==========================
@@ -89,7 +90,7 @@ class AppStoreApp:
         tk.Button(
             box,
             text="Installieren",
-            command=lambda a=app: self.install_app(a),
+            command=partial(self.install_app, app),
             bg="#4CAF50",
             fg="white",
             bd=0,
@@ -140,6 +141,11 @@ class MiniOS:
         # installierte Apps (Name -> {icon, file})
         self.installed_apps = {}
 
+        # Desktop-Icons als (Frame, Button, Label), für apply_theme
+        self.icons = []
+        # Icon-Buttons der installierten Apps (Name -> Button)
+        self._app_icons = {}
+
         self.desktop = tk.Frame(self.root, bg=self.theme_data["bg_main"])
         self.desktop.pack(fill="both", expand=True)
 
@@ -148,15 +154,25 @@ class MiniOS:
     # ------------- Theme -------------
 
     def set_theme(self, mode):
+        if mode == self.theme:
+            return  # nichts zu ändern, Desktop nicht neu aufbauen
         self.theme = mode
         self.theme_data = DARK_THEME if mode == "dark" else LIGHT_THEME
         self.apply_theme()
 
     def apply_theme(self):
-        self.desktop.configure(bg=self.theme_data["bg_main"])
-        for child in self.desktop.winfo_children():
-            child.destroy()
-        self.build_desktop()
+        # nur Farben ändern sich -> vorhandene Widgets umfärben statt neu bauen
+        t = self.theme_data
+        self.desktop.configure(bg=t["bg_main"])
+        for frame, btn, label in self.icons:
+            frame.configure(bg=t["bg_main"])
+            btn.configure(
+                bg=t["icon_bg"],
+                fg=t["icon_fg"],
+                activebackground=t["icon_bg"],
+                activeforeground=t["icon_fg"],
+            )
+            label.configure(bg=t["bg_main"], fg=t["fg_display"])
 
     # ------------- Desktop -------------
 
@@ -164,8 +180,8 @@ class MiniOS:
         # Feste Icons (z.B. App‑Store, Einstellungen)
         fixed_apps = [
             ("App‑Store", "🛒", self.open_appstore),
-            ("Theme Hell", "☀", lambda: self.set_theme("light")),
-            ("Theme Dunkel", "🌙", lambda: self.set_theme("dark")),
+            ("Theme Hell", "☀", partial(self.set_theme, "light")),
+            ("Theme Dunkel", "🌙", partial(self.set_theme, "dark")),
         ]
 
         # Feste Apps zuerst
@@ -176,18 +192,22 @@ class MiniOS:
             row += 1
 
         # Installierte Apps (aus App‑Store)
-        for name, data in self.installed_apps.items():
-            self.create_icon(
-                name,
-                data["icon"],
-                row,
-                0,
-                lambda n=name: self.launch_app(
-                    self.installed_apps[n]["file"], n
-                ),
-            )
+        for name in self.installed_apps:
+            self.create_app_icon(name, row)
             row += 1
 
+    def create_app_icon(self, name, row):
+        _, btn, _ = self.create_icon(
+            name,
+            self.installed_apps[name]["icon"],
+            row,
+            0,
+            lambda n=name: self.launch_app(
+                self.installed_apps[n]["file"], n
+            ),
+        )
+        self._app_icons[name] = btn
+
     def create_icon(self, name, icon, row, col, callback):
         t = self.theme_data
         frame = tk.Frame(self.desktop, bg=t["bg_main"])
@@ -208,13 +228,17 @@ class MiniOS:
         )
         btn.pack()
 
-        tk.Label(
+        label = tk.Label(
             frame,
             text=name,
             bg=t["bg_main"],
             fg=t["fg_display"],
             font=("Helvetica", 11),
-        ).pack(pady=(5, 0))
+        )
+        label.pack(pady=(5, 0))
+
+        self.icons.append((frame, btn, label))
+        return frame, btn, label
 
     # ------------- Fenster -------------
 
@@ -274,11 +298,16 @@ class MiniOS:
         app.get_widget().pack(fill="both", expand=True)
 
     def register_app(self, name, icon, filepath):
+        is_new = name not in self.installed_apps
         self.installed_apps[name] = {
             "icon": icon,
             "file": filepath,
         }
-        self.apply_theme()  # Desktop neu aufbauen
+        if is_new:
+            # nur das neue Icon anhängen statt den Desktop neu aufzubauen
+            self.create_app_icon(name, len(self.icons))
+        else:
+            self._app_icons[name].configure(text=icon)
 
     def launch_app(self, filepath, title):
         content = self.open_window(title)